@@ -27,8 +27,11 @@ class DockerSandboxClient:
         )
         self.healthcheck_host = healthcheck_host
         self.sandbox_id = sandbox_id
+        # Tool calls hit the same sandbox API repeatedly; keep connections alive.
+        self._http = requests.Session()
 
     def close(self) -> None:
+        self._http.close()
         self.manager.close()
 
     def set_sandbox_id(self, sandbox_id: str | None) -> None:
@@ -100,18 +103,21 @@ class DockerSandboxClient:
     ) -> Any:
         base_url, _ = self._sandbox_api_base(sandbox_id)
         url = f"{base_url}{path}"
-        response = requests.get(url, timeout=max(1, timeout_sec))
+        response = self._http.get(url, timeout=max(1, timeout_sec))
         return self._parse_response(response)
 
-    def api_post(
+    def api_post_text(
         self,
         *,
         sandbox_id: str | None,
         path: str,
         payload: dict[str, Any],
         timeout_sec: int = 30,
-    ) -> Any:
+    ) -> str:
         base_url, _ = self._sandbox_api_base(sandbox_id)
         url = f"{base_url}{path}"
-        response = requests.post(url, json=payload, timeout=max(1, timeout_sec))
-        return self._parse_response(response)
+        response = self._http.post(url, json=payload, timeout=max(1, timeout_sec))
+        if response.status_code >= 400:
+            # _parse_response raises with the decoded error body.
+            self._parse_response(response)
+        return response.text
@@ -2,7 +2,6 @@ from __future__ import annotations
 
 import asyncio
 import copy
-import json
 from dataclasses import dataclass
 from typing import Any
 
@@ -64,10 +63,10 @@ class SandboxToolRuntime:
             timeout_sec = max(timeout_sec, int(raw_timeout / 1000) + 15)
         return timeout_sec
 
-    async def invoke(self, *, path: str, payload: dict[str, Any]) -> Any:
+    async def invoke(self, *, path: str, payload: dict[str, Any]) -> str:
         timeout_sec = self._http_timeout_for(payload)
         return await asyncio.to_thread(
-            self.client.api_post,
+            self.client.api_post_text,
             sandbox_id=self.sandbox_id,
             path=path,
             payload=payload,
@@ -86,23 +85,23 @@ class SandboxHttpTool(Tool):
         self.name = spec.name
         self.description = spec.description
         self.requires_confirmation = bool(spec.requires_confirmation)
-
-    def schema(self) -> dict:
-        return {
+        # Built once per tool: the registry hands this to every LLM request,
+        # and callers treat it as read-only.
+        self._schema = {
             "type": "function",
             "function": {
                 "name": self.name,
                 "description": self.description,
-                "parameters": copy.deepcopy(self._spec.parameters),
+                "parameters": copy.deepcopy(spec.parameters),
                 "strict": True,
             },
         }
 
+    def schema(self) -> dict:
+        return self._schema
+
     async def execute(self, **kwargs) -> str:
-        result = await self._runtime.invoke(path=self._spec.path, payload=dict(kwargs))
-        if isinstance(result, str):
-            return result
-        return json.dumps(result, ensure_ascii=False)
+        return await self._runtime.invoke(path=self._spec.path, payload=dict(kwargs))
 
 
 TOOL_SPECS: tuple[SandboxToolSpec, ...] = (
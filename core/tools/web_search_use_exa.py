@@ -21,6 +21,7 @@ API_CONFIG = {
     "DEFAULT_NUM_RESULTS": 8,
 }
 DEFAULT_TIMEOUT_SECONDS = 25.0
+_NO_QUERY_RESPONSE = json.dumps({"error": "No search query provided."}, ensure_ascii=False)
 
 
 class LiveCrawl(str, Enum):
@@ -60,33 +61,40 @@ class _SearchOptions:
 TITLE_RE = re.compile(r"^Title:\s*(.+)$", re.MULTILINE)
 URL_RE = re.compile(r"^URL:\s*(\S+)\s*$", re.MULTILINE)
 TEXT_RE = re.compile(r"^Text:\s*(.*)$", re.MULTILINE)
+# 常见噪声行，合并为一个正则，避免每行逐个 re.match
+NOISE_LINE_RE = re.compile(
+    "|".join(
+        f"(?:{p})"
+        for p in (
+            r"^\[\]\s*$",  # 单独的 []
+            r"^\s*Signing in\.\.\.\s*$",
+            r"^\s*Log in.*$",
+            r"^\s*Sign up.*$",
+            r"^\s*SearchK\s*$",
+            r"^\s*Skip to.*$",
+            r"^\s*\[\s*.*?\s*\]\s*$",  # 纯 [xxx] 导航
+            r"^!\[\]\s*$",  # Markdown 空图片
+        )
+    ),
+    re.IGNORECASE,
+)
+WHITESPACE_RE = re.compile(r"\s+")
 
 
 def _clean_snippet(text: str) -> str:
     """清洗噪声 & 生成短摘要"""
     max_len = 300
-    # 常见噪声行
-    noise_patterns = [
-        r"^\[\]\s*$",  # 单独的 []
-        r"^\s*Signing in\.\.\.\s*$",
-        r"^\s*Log in.*$",
-        r"^\s*Sign up.*$",
-        r"^\s*SearchK\s*$",
-        r"^\s*Skip to.*$",
-        r"^\s*\[\s*.*?\s*\]\s*$",  # 纯 [xxx] 导航
-        r"^!\[\]\s*$",  # Markdown 空图片
-    ]
     lines = []
     for line in text.splitlines():
         s = line.strip()
         if not s:
             continue
-        if any(re.match(p, s, re.IGNORECASE) for p in noise_patterns):
+        if NOISE_LINE_RE.match(s):
             continue
         lines.append(s)
 
     cleaned = " ".join(lines)
-    cleaned = re.sub(r"\s+", " ", cleaned).strip()
+    cleaned = WHITESPACE_RE.sub(" ", cleaned).strip()
 
     # 截断（你可以按 UI 需要调整）
     return cleaned[:max_len] + ("..." if len(cleaned) > max_len else "")
@@ -237,7 +245,7 @@ class WebSearch(Tool):
         raw_num = kwargs.get("numResults") or None
         raw_ctx = kwargs.get("contextMaxCharacters") or None
         if not q:
-            return json.dumps({"error": "No search query provided."}, ensure_ascii=False)
+            return _NO_QUERY_RESPONSE
 
         stype = raw_type if raw_type in {e.value for e in SearchType} else SearchType.auto.value
         live = raw_live if raw_live in {e.value for e in LiveCrawl} else LiveCrawl.fallback.value
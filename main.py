@@ -4,9 +4,10 @@ Entry point.
 """
 import sys
 import asyncio
+import errno
 import os
 from pathlib import Path
-from typing import Any, Tuple
+from typing import Any, Iterator, Tuple
 
 if sys.platform.startswith("win"):
     asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
@@ -97,6 +98,22 @@ def _close_data_file_handlers(data_root: Path) -> None:
             logger.warning("Failed to close log handler '%s': %s", file_name, exc)
 
 
+def _iter_data_entries(root: Path) -> Iterator[os.DirEntry[str]]:
+    pending = [str(root)]
+    while pending:
+        current = pending.pop()
+        try:
+            with os.scandir(current) as scanner:
+                entries = list(scanner)
+        except OSError as exc:
+            logger.warning("Failed to scan data dir '%s': %s", current, exc)
+            continue
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                pending.append(entry.path)
+            yield entry
+
+
 def _clear_data_files(data_root: Path) -> Tuple[int, int]:
     target_root = data_root.resolve()
     if not target_root.exists():
@@ -106,15 +123,15 @@ def _clear_data_files(data_root: Path) -> Tuple[int, int]:
 
     deleted = 0
     failed = 0
-    for target in target_root.rglob("*"):
-        if not target.is_file() and not target.is_symlink():
+    for entry in _iter_data_entries(target_root):
+        if not entry.is_symlink() and not entry.is_file(follow_symlinks=False):
             continue
         try:
-            target.unlink()
+            os.unlink(entry.path)
             deleted += 1
         except Exception as exc:
             failed += 1
-            logger.warning("Failed to delete data file '%s': %s", target, exc)
+            logger.warning("Failed to delete data file '%s': %s", entry.path, exc)
     return deleted, failed
 
 
@@ -127,25 +144,20 @@ def _prune_empty_data_dirs(data_root: Path) -> Tuple[int, int]:
 
     removed = 0
     failed = 0
-    dirs = [p for p in target_root.rglob("*") if p.is_dir()]
+    dirs = [Path(entry.path) for entry in _iter_data_entries(target_root) if entry.is_dir(follow_symlinks=False)]
     dirs.sort(key=lambda p: len(p.parts), reverse=True)
     for directory in dirs:
         if directory == target_root:
             continue
         try:
-            # Remove empty directories only.
-            next(directory.iterdir())
-            continue
-        except StopIteration:
-            try:
-                directory.rmdir()
-                removed += 1
-            except Exception as exc:
-                failed += 1
-                logger.warning("Failed to delete empty data dir '%s': %s", directory, exc)
-        except Exception as exc:
+            # rmdir only succeeds on empty directories, so no listing is needed.
+            os.rmdir(directory)
+            removed += 1
+        except OSError as exc:
+            if exc.errno in (errno.ENOTEMPTY, errno.EEXIST):
+                continue
             failed += 1
-            logger.warning("Failed to inspect data dir '%s': %s", directory, exc)
+            logger.warning("Failed to delete empty data dir '%s': %s", directory, exc)
     return removed, failed
 
 
@@ -1,6 +1,7 @@
 ﻿from __future__ import annotations
 
 import asyncio
+import itertools
 import os
 import re
 import signal
@@ -8,6 +9,7 @@ import subprocess
 import time
 import uuid
 from contextlib import asynccontextmanager
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
@@ -38,32 +40,52 @@ UPLOAD_ROOT = Path(os.getenv("SANDBOX_UPLOAD_ROOT", "/config/uploads")).resolve(
 RESULT_ARTIFACT_ROOT = Path(
     os.getenv("SANDBOX_RESULT_ARTIFACT_ROOT", "/config/tool-artifacts/results")
 ).resolve()
+BACKGROUND_JOB_ROOT = (RESULT_ARTIFACT_ROOT / "jobs").resolve()
 BACKGROUND_LAUNCH_TIMEOUT_MS = 2000
 BACKGROUND_EARLY_EXIT_WINDOW_MS = 300
+BACKGROUND_EARLY_OUTPUT_READ_CHARS = 64 * 1024
+_ARTIFACT_SEQUENCE = itertools.count()
+
+
+_UNSAFE_TOOL_NAME_CHARS = re.compile(r"[^A-Za-z0-9._-]+")
 
 
 def _safe_tool_name(value: str) -> str:
-    normalized = re.sub(r"[^A-Za-z0-9._-]+", "_", str(value or "").strip())
+    normalized = _UNSAFE_TOOL_NAME_CHARS.sub("_", str(value or "").strip())
     normalized = normalized.strip("._-")
     return normalized or "tool"
 
 
-def _artifact_path(tool_name: str, suffix: str) -> Path:
-    folder = (RESULT_ARTIFACT_ROOT / _safe_tool_name(tool_name)).resolve()
+@lru_cache(maxsize=64)
+def _artifact_folder(tool_name: str) -> Path:
+    folder = RESULT_ARTIFACT_ROOT / _safe_tool_name(tool_name)
     folder.mkdir(parents=True, exist_ok=True)
-    filename = f"{time.time_ns()}_{os.getpid()}.{suffix}"
-    return (folder / filename).resolve()
+    return folder
+
+
+def _artifact_path(tool_name: str, suffix: str) -> Path:
+    filename = f"{time.time_ns()}_{os.getpid()}_{next(_ARTIFACT_SEQUENCE)}.{suffix}"
+    return _artifact_folder(tool_name) / filename
 
 
 def _write_text_artifact(tool_name: str, text: str, *, suffix: str = "txt") -> str:
     out_path = _artifact_path(tool_name, suffix=suffix)
-    out_path.write_text(text, encoding="utf-8")
+    try:
+        out_path.write_text(text, encoding="utf-8")
+    except FileNotFoundError:
+        # The artifact root is a mounted volume and may be wiped underneath us.
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        out_path.write_text(text, encoding="utf-8")
     return str(out_path)
 
 
 def _write_binary_artifact(tool_name: str, data: bytes, *, suffix: str) -> str:
     out_path = _artifact_path(tool_name, suffix=suffix)
-    out_path.write_bytes(data)
+    try:
+        out_path.write_bytes(data)
+    except FileNotFoundError:
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        out_path.write_bytes(data)
     return str(out_path)
 
 
@@ -86,7 +108,7 @@ async def _kill_process_tree(proc: asyncio.subprocess.Process) -> None:
 async def lifespan(_app: FastAPI):
     UPLOAD_ROOT.mkdir(parents=True, exist_ok=True)
     RESULT_ARTIFACT_ROOT.mkdir(parents=True, exist_ok=True)
-    _background_job_root().mkdir(parents=True, exist_ok=True)
+    BACKGROUND_JOB_ROOT.mkdir(parents=True, exist_ok=True)
     try:
         yield
     finally:
@@ -213,7 +235,8 @@ def health() -> dict[str, str]:
 
 
 def _tool_base_dir() -> Path:
-    return Path.cwd().resolve()
+    # os.getcwd() is already absolute; resolve_path resolves and caches it.
+    return Path(os.getcwd())
 
 
 def _artifact_writer(tool_name: str, text: str) -> str:
@@ -224,21 +247,20 @@ def _binary_artifact_writer(tool_name: str, data: bytes, suffix: str) -> str:
     return _write_binary_artifact(tool_name, data, suffix=suffix)
 
 
-def _background_job_root() -> Path:
-    return (RESULT_ARTIFACT_ROOT / "jobs").resolve()
-
-
 def _background_job_id() -> str:
     return f"job_{time.time_ns()}_{uuid.uuid4().hex[:8]}"
 
 
 def _background_log_path(job_id: str) -> Path:
-    return (_background_job_root() / f"{job_id}.log").resolve()
+    return BACKGROUND_JOB_ROOT / f"{job_id}.log"
 
 
 def _read_background_log_excerpt(log_path: Path) -> str:
+    # Only the head of the log is shown, so a chatty job should not make us
+    # load everything it wrote during the launch window.
     try:
-        text = log_path.read_text(encoding="utf-8", errors="replace")
+        with log_path.open("r", encoding="utf-8", errors="replace") as handle:
+            text = handle.read(BACKGROUND_EARLY_OUTPUT_READ_CHARS)
     except OSError:
         return ""
     return shape_background_bash_early_output(text)
@@ -282,7 +304,7 @@ def _tool_error_payload(exc: Exception, *, metadata: dict[str, object] | None =
 async def _execute_foreground_bash_command(command: str, *, cwd_path: Path, timeout_ms: int) -> dict[str, Any]:
     spawn_kwargs: dict[str, Any] = {}
     if os.name != "nt":
-        spawn_kwargs["preexec_fn"] = os.setsid
+        spawn_kwargs["start_new_session"] = True
 
     try:
         proc = await asyncio.create_subprocess_shell(
@@ -311,7 +333,8 @@ async def _execute_foreground_bash_command(command: str, *, cwd_path: Path, time
     if timed_out:
         output_text = append_bash_metadata(output_text, timeout_ms=timeout_ms)
     exit_code = None if proc.returncode is None else int(proc.returncode)
-    return format_bash_result(
+    return await asyncio.to_thread(
+        format_bash_result,
         output_text,
         exit_code=exit_code,
         artifact_writer=_artifact_writer,
@@ -378,7 +401,7 @@ async def _execute_background_bash_command(command: str, *, cwd_path: Path) -> d
         log_path=str(log_path),
         exit_code=int(exit_code),
         artifact_writer=_artifact_writer,
-        early_output=_read_background_log_excerpt(log_path),
+        early_output=await asyncio.to_thread(_read_background_log_excerpt, log_path),
     )
 
 
@@ -391,7 +414,7 @@ async def _execute_bash_command(
 ) -> dict[str, Any]:
     base_dir = _tool_base_dir()
     cwd_path = resolve_path(workdir or ".", base_dir=base_dir)
-    if not cwd_path.exists() or not cwd_path.is_dir():
+    if not cwd_path.is_dir():
         raise ToolInputError(f"invalid workdir: {cwd_path}")
     if background:
         return await _execute_background_bash_command(command, cwd_path=cwd_path)
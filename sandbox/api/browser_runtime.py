@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import asyncio
+import functools
 import json
 import os
 import re
@@ -18,7 +19,6 @@ from .tool_runtime import (
 TextArtifactWriter = Callable[[str, str], str]
 BinaryArtifactWriter = Callable[[str, bytes, str], str]
 DIALOG_OPEN_WAIT_SECONDS = 1.0
-_WHITESPACE_RE = re.compile(r"\s+")
 _LOGIN_SUCCESS_MARKERS = (
     "login successful",
     "logged in",
@@ -113,6 +113,12 @@ _EVALUATE_SCRIPT_BLOCKLIST: tuple[tuple[re.Pattern[str], str], ...] = (
     (re.compile(r"\bhistory\.(?:pushState|replaceState)\s*\(", re.IGNORECASE), "history mutation"),
     (re.compile(r"\bscroll(?:To|By)\s*\(", re.IGNORECASE), "scroll mutation"),
 )
+# One pass over the script decides the common (allowed) case; the per-pattern
+# loop only runs to name the first blocklist entry that matched.
+_EVALUATE_SCRIPT_BLOCKED_RE = re.compile(
+    "|".join(f"(?:{pattern.pattern})" for pattern, _label in _EVALUATE_SCRIPT_BLOCKLIST),
+    re.IGNORECASE,
+)
 _UID_RECOVERY_SCRIPT = """
 ({ uid, descriptor }) => {
     const normalize = (value) => String(value || "").replace(/\s+/g, " ").trim();
@@ -480,20 +486,30 @@ def _record_value(record: Any, key: str) -> Any:
 
 
 def _normalize_barrier_text(value: Any) -> str:
-    return _WHITESPACE_RE.sub(" ", str(value or "")).strip().lower()
+    # str.split() breaks on the same Unicode whitespace as \s+ and drops the ends.
+    return " ".join(str(value or "").split()).lower()
+
+
+@functools.lru_cache(maxsize=None)
+def _normalized_markers(markers: tuple[str, ...]) -> tuple[tuple[str, str], ...]:
+    # Marker tables are module constants; normalize each one once, not per page.
+    pairs = ((marker, _normalize_barrier_text(marker)) for marker in markers)
+    return tuple((marker, normalized) for marker, normalized in pairs if normalized)
 
 
 def _collect_marker_signals(source: str, haystack: str, markers: tuple[str, ...]) -> list[str]:
-    signals: list[str] = []
-    for marker in markers:
-        normalized = _normalize_barrier_text(marker)
-        if normalized and normalized in haystack:
-            signals.append(f"{source}:{marker}")
-    return signals
+    if not haystack:
+        return []
+    return [
+        f"{source}:{marker}"
+        for marker, normalized in _normalized_markers(markers)
+        if normalized in haystack
+    ]
 
 
 def _collect_access_denied_403_signals(source: str, haystack: str) -> list[str]:
-    if not haystack:
+    # Every pattern needs the literal status code, so most pages skip the regexes.
+    if "403" not in haystack:
         return []
     for pattern in _ACCESS_DENIED_403_PATTERNS:
         if pattern.search(haystack):
@@ -686,6 +702,8 @@ def _normalize_evaluate_script_source(script: str) -> str:
     source = str(script or "").strip()
     if not source:
         raise ToolInputError("script must not be empty")
+    if _EVALUATE_SCRIPT_BLOCKED_RE.search(source) is None:
+        return source
     for pattern, label in _EVALUATE_SCRIPT_BLOCKLIST:
         if pattern.search(source):
             raise ToolInputError(
@@ -747,7 +765,8 @@ async def _format_browser_result(
             if hitl_barrier is not None:
                 payload_metadata["hitlBarrier"] = hitl_barrier
     payload_metadata["pageId"] = int(page_id)
-    return apply_unified_truncation(
+    return await asyncio.to_thread(
+        apply_unified_truncation,
         {
             "output": output,
             "metadata": payload_metadata,
@@ -772,7 +791,9 @@ def _validate_latest_uid(state: Any, *, page_id: int, uid: str) -> None:
     if current_document_id and snapshot_document_id and current_document_id != snapshot_document_id:
         raise ToolInputError(f"snapshot is stale for pageId={page_id}; call take_snapshot again")
 
-    uids = set(_record_value(record, "uids") or [])
+    uids = _record_value(record, "uids") or ()
+    if not isinstance(uids, (set, frozenset, dict)):
+        uids = set(uids)
     if uid not in uids:
         raise ToolInputError(f"uid '{uid}' is not present in the latest snapshot; call take_snapshot again")
 
@@ -988,7 +1009,11 @@ async def take_snapshot(
         or (getattr(state, "page_document_ids", {}) or {}).get(page_id)
         or f"doc-{page_id}"
     )
-    uids = set(snapshot_data.get("uids") or [])
+    # capture_snapshot already hands back a fresh set; register_snapshot copies
+    # it for the record, so only coerce other iterables here.
+    uids = snapshot_data.get("uids") or set()
+    if not isinstance(uids, set):
+        uids = set(uids)
     register_snapshot = getattr(state, "register_snapshot", None)
     snapshot_id = None
     if callable(register_snapshot):
@@ -1015,8 +1040,7 @@ async def take_snapshot(
         metadata["hitlBarrier"] = hitl_barrier
     if file_path:
         target = resolve_path(file_path, base_dir=base_dir)
-        target.parent.mkdir(parents=True, exist_ok=True)
-        target.write_text(output, encoding="utf-8")
+        await asyncio.to_thread(_write_snapshot_file, target, output)
         metadata["path"] = str(target)
 
     return await _format_browser_result(
@@ -1029,6 +1053,11 @@ async def take_snapshot(
     )
 
 
+def _write_snapshot_file(target: Path, text: str) -> None:
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_text(text, encoding="utf-8")
+
+
 async def evaluate_script(
     *,
     state: Any,
@@ -1261,11 +1290,15 @@ async def take_screenshot(
     screenshot_bytes = await screenshot_fn(type=image_format, full_page=full_page, quality=quality)
     if file_path:
         target = resolve_path(file_path, base_dir=base_dir)
-        target.parent.mkdir(parents=True, exist_ok=True)
-        target.write_bytes(screenshot_bytes)
+        await asyncio.to_thread(_write_screenshot_file, target, screenshot_bytes)
         saved_path = str(target)
     else:
-        saved_path = binary_artifact_writer("tools_take_screenshot", screenshot_bytes, image_format)
+        saved_path = await asyncio.to_thread(
+            binary_artifact_writer,
+            "tools_take_screenshot",
+            screenshot_bytes,
+            image_format,
+        )
 
     mime_type = {
         "png": "image/png",
@@ -1288,6 +1321,11 @@ async def take_screenshot(
     }
 
 
+def _write_screenshot_file(target: Path, data: bytes) -> None:
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_bytes(data)
+
+
 async def press_key(
     *,
     state: Any,
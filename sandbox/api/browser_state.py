@@ -531,7 +531,7 @@ class BrowserState:
         if not isinstance(snapshot, dict):
             snapshot = {}
 
-        lines = [str(line).strip() for line in (snapshot.get("lines") or []) if str(line).strip()]
+        lines = [stripped for line in (snapshot.get("lines") or []) if (stripped := str(line).strip())]
         document_id = str(snapshot.get("documentId") or snapshot.get("document_id") or "")
         if not document_id:
             page_id = self.get_page_id(page)
@@ -2,11 +2,16 @@ from __future__ import annotations
 
 from difflib import unified_diff
 import fnmatch
+import functools
+import os
+import shutil
 import subprocess
 from dataclasses import dataclass
 from difflib import get_close_matches
+import heapq
 from pathlib import Path
-from typing import Callable
+import stat
+from typing import Callable, Iterable, Iterator, TextIO
 
 UNIFIED_MAX_LINES = 200
 UNIFIED_MAX_BYTES = 10 * 1024
@@ -14,6 +19,8 @@ BACKGROUND_EARLY_OUTPUT_MAX_LINES = 40
 BACKGROUND_EARLY_OUTPUT_MAX_CHARS = 4000
 READ_DEFAULT_LIMIT = 200
 READ_LINE_MAX_CHARS = 2000
+READ_COUNT_CHUNK_CHARS = 1024 * 1024
+BINARY_SNIFF_BYTES = 8192
 GLOB_MAX_RESULTS = 100
 GREP_MAX_RESULTS = 100
 GREP_LINE_MAX_CHARS = 2000
@@ -29,6 +36,11 @@ IMAGE_SUFFIXES = {
     ".tif",
     ".tiff",
 }
+_GLOB_TRUNCATED_NOTICE = (
+    f"\n\n(Results are truncated: showing first {GLOB_MAX_RESULTS} results. "
+    "Consider using a more specific path or pattern.)"
+)
+_GREP_TRUNCATED_SUFFIX = f" (showing first {GREP_MAX_RESULTS})"
 
 
 class ToolInputError(ValueError):
@@ -39,7 +51,7 @@ class ToolExecutionError(RuntimeError):
     pass
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class SearchMatch:
     path: Path
     line_no: int
@@ -47,8 +59,13 @@ class SearchMatch:
     mtime: float
 
 
+@functools.lru_cache(maxsize=16)
+def _resolve_base_dir(raw_base: str) -> Path:
+    return Path(raw_base).resolve()
+
+
 def resolve_path(raw_path: str, *, base_dir: Path | None = None) -> Path:
-    base = Path(base_dir or Path.cwd()).resolve()
+    base = _resolve_base_dir(str(base_dir or os.getcwd()))
     candidate = Path(raw_path).expanduser()
     if not candidate.is_absolute():
         candidate = base / candidate
@@ -234,15 +251,21 @@ def read_path(
 ) -> dict[str, object]:
     if offset < 1:
         raise ToolInputError("offset must be greater than or equal to 1")
-    resolved_limit = READ_DEFAULT_LIMIT if limit is None else int(limit)
+    if limit is None:
+        resolved_limit = READ_DEFAULT_LIMIT
+    elif type(limit) is int:
+        resolved_limit = limit
+    else:
+        resolved_limit = int(limit)
     if resolved_limit < 1:
         raise ToolInputError("limit must be greater than or equal to 1")
 
     target = resolve_path(file_path, base_dir=base_dir)
-    if not target.exists():
+    target_stat = _stat_path(target)
+    if target_stat is None:
         raise ToolInputError(_build_missing_file_message(target))
 
-    if target.is_dir():
+    if stat.S_ISDIR(target_stat.st_mode):
         return _read_directory(target, offset=offset, limit=resolved_limit)
 
     suffix = target.suffix.lower()
@@ -263,20 +286,15 @@ def glob_paths(
     base_dir: Path | None = None,
 ) -> dict[str, object]:
     target = resolve_path(path or ".", base_dir=base_dir)
-    matches = _collect_glob_matches(pattern, target)
-    total = len(matches)
+    shown, total = _collect_glob_matches(pattern, target, limit=GLOB_MAX_RESULTS)
     truncated = total > GLOB_MAX_RESULTS
-    shown = matches[:GLOB_MAX_RESULTS]
 
     if not shown:
         output = "No files found"
     else:
         output = "\n".join(str(item) for item in shown)
         if truncated:
-            output += (
-                "\n\n(Results are truncated: showing first 100 results. "
-                "Consider using a more specific path or pattern.)"
-            )
+            output += _GLOB_TRUNCATED_NOTICE
 
     return {
         "output": output,
@@ -295,10 +313,11 @@ def grep_text(
     base_dir: Path | None = None,
 ) -> dict[str, object]:
     target = resolve_path(path or ".", base_dir=base_dir)
-    if not target.exists():
+    target_stat = _stat_path(target)
+    if target_stat is None:
         return {"output": "No files found", "metadata": {"matches": 0, "truncated": False}}
 
-    if target.is_dir():
+    if stat.S_ISDIR(target_stat.st_mode):
         cwd = target
         search_target = "."
     else:
@@ -318,20 +337,40 @@ def grep_text(
         argv.extend(["--glob", glob.strip()])
     argv.append(search_target)
 
-    proc = _run_command(argv, cwd=cwd)
-    if proc.returncode not in {0, 1, 2}:
-        raise ToolExecutionError(proc.stderr.strip() or f"rg exited with code {proc.returncode}")
+    # Consume rg's output as it is produced: only the top GREP_MAX_RESULTS
+    # matches are kept, the rest are just counted.
+    total = 0
+
+    def _counted(matches: Iterator[SearchMatch]) -> Iterator[SearchMatch]:
+        nonlocal total
+        for match in matches:
+            total += 1
+            yield match
 
-    matches = _parse_search_matches(proc.stdout, cwd=cwd)
-    if not matches:
+    with _spawn_command(argv, cwd=cwd) as proc:
+        try:
+            shown = heapq.nsmallest(
+                GREP_MAX_RESULTS,
+                _counted(_iter_search_matches(proc.stdout, cwd=cwd)),
+                key=lambda item: (-item.mtime, str(item.path), item.line_no),
+            )
+            # --no-messages keeps stderr down to fatal errors, so draining it
+            # after stdout cannot stall rg on a full pipe.
+            stderr = proc.stderr.read()
+        except BaseException:
+            proc.kill()
+            raise
+        returncode = proc.wait()
+
+    if returncode not in {0, 1, 2}:
+        raise ToolExecutionError(stderr.strip() or f"rg exited with code {returncode}")
+
+    if not total:
         return {"output": "No files found", "metadata": {"matches": 0, "truncated": False}}
 
-    matches.sort(key=lambda item: (-item.mtime, str(item.path), item.line_no))
-    total = len(matches)
     truncated = total > GREP_MAX_RESULTS
-    shown = matches[:GREP_MAX_RESULTS]
 
-    lines = [f"Found {total} matches" + (" (showing first 100)" if truncated else "")]
+    lines = [f"Found {total} matches" + (_GREP_TRUNCATED_SUFFIX if truncated else "")]
     current_path: Path | None = None
     for match in shown:
         if current_path != match.path:
@@ -347,13 +386,13 @@ def grep_text(
             [
                 "",
                 (
-                    f"(Results truncated: showing 100 of {total} matches ({hidden} hidden). "
+                    f"(Results truncated: showing {GREP_MAX_RESULTS} of {total} matches ({hidden} hidden). "
                     "Consider using a more specific path or pattern.)"
                 ),
             ]
         )
 
-    if proc.returncode == 2:
+    if returncode == 2:
         lines.extend(["", "(Some paths were inaccessible and skipped)"])
 
     return {
@@ -380,9 +419,10 @@ def edit_file(
         raise ToolInputError("No changes to apply: oldString and newString are identical.")
 
     target = resolve_path(file_path, base_dir=base_dir)
-    if not target.exists():
+    target_stat = _stat_path(target)
+    if target_stat is None:
         raise ToolInputError(f"File {target} not found")
-    if target.is_dir():
+    if stat.S_ISDIR(target_stat.st_mode):
         raise ToolInputError(f"Path is a directory, not a file: {target}")
 
     try:
@@ -405,7 +445,7 @@ def edit_file(
             "diagnostics": {},
             "diff": diff_text,
             "filediff": {
-                "file": str(target.resolve()),
+                "file": str(target),
                 "before": before,
                 "after": after,
                 "additions": additions,
@@ -427,10 +467,11 @@ def write_file(
         raise ToolInputError("filePath is required")
 
     target = resolve_path(file_path, base_dir=base_dir)
-    if target.exists() and target.is_dir():
+    target_stat = _stat_path(target)
+    if target_stat is not None and stat.S_ISDIR(target_stat.st_mode):
         raise ToolInputError(f"Path is a directory, not a file: {target}")
 
-    exists = target.exists()
+    exists = target_stat is not None
     try:
         target.parent.mkdir(parents=True, exist_ok=True)
         target.write_text(content, encoding="utf-8")
@@ -440,7 +481,7 @@ def write_file(
         "output": "Wrote file successfully.",
         "metadata": {
             "diagnostics": {},
-            "filepath": str(target.resolve()),
+            "filepath": str(target),
             "exists": exists,
         },
     }
@@ -453,18 +494,22 @@ def _truncate_with_artifact(
     tool_name: str,
     artifact_writer: Callable[[str, str], str],
 ) -> tuple[str, bool, str | None]:
-    encoded = text.encode("utf-8", errors="replace")
+    # ASCII output is measured and clipped as str; anything else is encoded once.
+    encoded = None if text.isascii() else text.encode("utf-8", errors="replace")
+    byte_length = len(text) if encoded is None else len(encoded)
     lines = text.splitlines()
-    if len(lines) <= UNIFIED_MAX_LINES and len(encoded) <= UNIFIED_MAX_BYTES:
+    if len(lines) <= UNIFIED_MAX_LINES and byte_length <= UNIFIED_MAX_BYTES:
         return text, False, None
 
     if len(lines) > UNIFIED_MAX_LINES:
         preview = "\n".join(lines[:UNIFIED_MAX_LINES])
         omitted_label = f"{len(lines) - UNIFIED_MAX_LINES} lines"
     else:
-        clipped = encoded[:UNIFIED_MAX_BYTES]
-        preview = clipped.decode("utf-8", errors="ignore")
-        omitted_label = f"{max(0, len(encoded) - len(clipped))} bytes"
+        if encoded is None:
+            preview = text[:UNIFIED_MAX_BYTES]
+        else:
+            preview = encoded[:UNIFIED_MAX_BYTES].decode("utf-8", errors="ignore")
+        omitted_label = f"{byte_length - UNIFIED_MAX_BYTES} bytes"
 
     output_path = artifact_writer(tool_name, text)
     rendered = "\n".join(
@@ -480,7 +525,17 @@ def _truncate_with_artifact(
     return rendered, True, output_path
 
 
+def _utf8_len(text: str) -> int:
+    # ASCII text encodes one byte per character, so skip building the bytes.
+    if text.isascii():
+        return len(text)
+    return len(text.encode("utf-8", errors="replace"))
+
+
 def _looks_like_image_base64(output: str) -> bool:
+    # Cheap substring check first: strip() would copy the whole output.
+    if "data:image/" not in output:
+        return False
     stripped = output.strip()
     return stripped.startswith("data:image/")
 
@@ -488,10 +543,10 @@ def _looks_like_image_base64(output: str) -> bool:
 def _build_missing_file_message(target: Path) -> str:
     message = f"File not found: {target}"
     parent = target.parent
-    if not parent.exists() or not parent.is_dir():
+    if not parent.is_dir():
         return message
 
-    siblings = sorted(item.name for item in parent.iterdir())
+    siblings = sorted(os.listdir(parent))
     suggestions = get_close_matches(target.name, siblings, n=3, cutoff=0.1)
     if not suggestions:
         return message
@@ -499,13 +554,14 @@ def _build_missing_file_message(target: Path) -> str:
 
 
 def _read_directory(target: Path, *, offset: int, limit: int) -> dict[str, object]:
-    entries = sorted(_format_directory_entry(item) for item in target.iterdir())
+    with os.scandir(target) as scanner:
+        entries = [_format_directory_entry(entry) for entry in scanner]
     start = offset - 1
-    shown = entries[start : start + limit]
+    shown = heapq.nsmallest(start + limit, entries)[start:]
     truncated = start + len(shown) < len(entries)
 
     lines = [
-        f"<path>{target.resolve()}</path>",
+        f"<path>{target}</path>",
         "<type>directory</type>",
         "<entries>",
         *shown,
@@ -530,28 +586,29 @@ def _read_text_file(target: Path, *, offset: int, limit: int) -> dict[str, objec
     byte_count = 0
     byte_capped = False
     has_more_lines = False
+    line_max_chars = READ_LINE_MAX_CHARS
+    max_bytes = UNIFIED_MAX_BYTES
 
     with target.open("r", encoding="utf-8", errors="replace") as handle:
         for line_no, raw_line in enumerate(handle, start=1):
             total_lines = line_no
             if line_no < offset:
                 continue
-            if byte_capped:
-                continue
             if shown_count >= limit:
                 has_more_lines = True
-                continue
+                total_lines += _count_remaining_lines(handle)
+                break
 
             text = raw_line.rstrip("\r\n")
-            if len(text) > READ_LINE_MAX_CHARS:
-                text = text[: READ_LINE_MAX_CHARS - 3] + "..."
+            if len(text) > line_max_chars:
+                text = text[: line_max_chars - 3] + "..."
             rendered = f"{line_no}: {text}"
-            extra_bytes = len(rendered.encode("utf-8", errors="replace"))
+            extra_bytes = _utf8_len(rendered)
             if rendered_lines:
                 extra_bytes += 1
-            if byte_count + extra_bytes > UNIFIED_MAX_BYTES:
+            if byte_count + extra_bytes > max_bytes:
                 byte_capped = True
-                continue
+                break
 
             rendered_lines.append(rendered)
             byte_count += extra_bytes
@@ -567,7 +624,7 @@ def _read_text_file(target: Path, *, offset: int, limit: int) -> dict[str, objec
 
     truncated = has_more_lines or byte_capped
     lines = [
-        f"<path>{target.resolve()}</path>",
+        f"<path>{target}</path>",
         "<type>file</type>",
         "<content>",
         *rendered_lines,
@@ -599,12 +656,31 @@ def _read_text_file(target: Path, *, offset: int, limit: int) -> dict[str, objec
     return {"output": "\n".join(lines), "metadata": {"truncated": truncated}}
 
 
-def _format_directory_entry(path: Path) -> str:
-    return path.name + ("/" if path.is_dir() else "")
+def _count_remaining_lines(handle: TextIO) -> int:
+    count = 0
+    last_chunk = ""
+    while chunk := handle.read(READ_COUNT_CHUNK_CHARS):
+        count += chunk.count("\n")
+        last_chunk = chunk
+    if last_chunk and not last_chunk.endswith("\n"):
+        count += 1
+    return count
+
+
+def _stat_path(target: Path) -> os.stat_result | None:
+    try:
+        return os.stat(target)
+    except (FileNotFoundError, NotADirectoryError, ValueError):
+        return None
+
+
+def _format_directory_entry(entry: os.DirEntry[str]) -> str:
+    return entry.name + ("/" if entry.is_dir() else "")
 
 
 def _is_binary_file(target: Path) -> bool:
-    sample = target.read_bytes()[:8192]
+    with target.open("rb") as handle:
+        sample = handle.read(BINARY_SNIFF_BYTES)
     if b"\x00" in sample:
         return True
     try:
@@ -614,50 +690,72 @@ def _is_binary_file(target: Path) -> bool:
     return False
 
 
-def _collect_glob_matches(pattern: str, target: Path) -> list[Path]:
-    if not target.exists():
-        return []
-    if target.is_file():
-        return [target.resolve()] if fnmatch.fnmatch(target.name, pattern) else []
+def _collect_glob_matches(pattern: str, target: Path, *, limit: int) -> tuple[list[Path], int]:
+    target_stat = _stat_path(target)
+    if target_stat is None:
+        return [], 0
+    if stat.S_ISREG(target_stat.st_mode):
+        return ([target], 1) if fnmatch.fnmatch(target.name, pattern) else ([], 0)
 
     proc = _run_command(["rg", "--files", "-g", pattern], cwd=target)
     if proc.returncode not in {0, 1}:
         raise ToolExecutionError(proc.stderr.strip() or f"rg exited with code {proc.returncode}")
 
-    matches = [(target / line.strip()).resolve() for line in proc.stdout.splitlines() if line.strip()]
-    matches.sort(key=lambda item: (-_safe_mtime(item), str(item)))
-    return matches
+    root = str(target)
+    listed = [line for line in (raw.strip() for raw in proc.stdout.splitlines()) if line]
+    shown = heapq.nsmallest(
+        limit,
+        (_join_listed_path(root, rel) for rel in listed),
+        key=lambda item: (-_safe_mtime(item), str(item)),
+    )
+    return shown, len(listed)
+
+
+def _join_listed_path(root: str, rel: str) -> Path:
+    # rg lists paths relative to an already-resolved cwd without ".." segments,
+    # so only a symlinked entry can land outside of it.
+    candidate = os.path.join(root, rel)
+    if os.path.islink(candidate):
+        return Path(candidate).resolve()
+    return Path(candidate)
 
 
-def _parse_search_matches(stdout: str, *, cwd: Path) -> list[SearchMatch]:
-    matches: list[SearchMatch] = []
-    for raw_line in stdout.splitlines():
+def _iter_search_matches(stdout: Iterable[str], *, cwd: Path) -> Iterator[SearchMatch]:
+    file_info: dict[str, tuple[Path, float]] = {}
+    root = str(cwd)
+    line_max_chars = GREP_LINE_MAX_CHARS
+    for raw_line in _split_output_lines(stdout):
         parts = raw_line.split("|", 2)
         if len(parts) != 3:
             continue
         file_part, line_part, text_part = parts
-        try:
-            line_no = int(line_part)
-        except ValueError:
+        if not line_part.isdecimal():
             continue
+        line_no = int(line_part)
 
-        candidate = Path(file_part)
-        if not candidate.is_absolute():
-            candidate = (cwd / candidate).resolve()
+        info = file_info.get(file_part)
+        if info is None:
+            candidate = _join_listed_path(root, file_part)
+            info = (candidate, _safe_mtime(candidate))
+            file_info[file_part] = info
 
         text = text_part
-        if len(text) > GREP_LINE_MAX_CHARS:
-            text = text[: GREP_LINE_MAX_CHARS - 3] + "..."
-
-        matches.append(
-            SearchMatch(
-                path=candidate.resolve(),
-                line_no=line_no,
-                text=text,
-                mtime=_safe_mtime(candidate),
-            )
+        if len(text) > line_max_chars:
+            text = text[: line_max_chars - 3] + "..."
+
+        yield SearchMatch(
+            path=info[0],
+            line_no=line_no,
+            text=text,
+            mtime=info[1],
         )
-    return matches
+
+
+def _split_output_lines(stdout: Iterable[str]) -> Iterator[str]:
+    # Streamed chunks only end at newlines; splitlines() also breaks on the
+    # other Unicode line boundaries, as it did on the fully buffered output.
+    for chunk in stdout:
+        yield from chunk.splitlines()
 
 
 def _safe_mtime(path: Path) -> float:
@@ -667,10 +765,22 @@ def _safe_mtime(path: Path) -> float:
         return 0.0
 
 
+@functools.lru_cache(maxsize=16)
+def _find_executable(name: str, search_path: str) -> str | None:
+    return shutil.which(name, path=search_path)
+
+
+def _command_argv(argv: list[str]) -> list[str]:
+    # Pin the PATH lookup so the child does not probe every PATH entry on each
+    # call; an unresolved name is passed through and fails the usual way.
+    executable = _find_executable(argv[0], os.environ.get("PATH", os.defpath))
+    return [executable, *argv[1:]] if executable else argv
+
+
 def _run_command(argv: list[str], *, cwd: Path) -> subprocess.CompletedProcess[str]:
     try:
         return subprocess.run(
-            argv,
+            _command_argv(argv),
             cwd=str(cwd),
             check=False,
             stdout=subprocess.PIPE,
@@ -683,6 +793,21 @@ def _run_command(argv: list[str], *, cwd: Path) -> subprocess.CompletedProcess[s
         raise ToolExecutionError(f"Required executable not found: {argv[0]}") from exc
 
 
+def _spawn_command(argv: list[str], *, cwd: Path) -> subprocess.Popen[str]:
+    try:
+        return subprocess.Popen(
+            _command_argv(argv),
+            cwd=str(cwd),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+        )
+    except FileNotFoundError as exc:
+        raise ToolExecutionError(f"Required executable not found: {argv[0]}") from exc
+
+
 def _replace_text(source: str, old: str, new: str, *, replace_all: bool) -> str:
     exact_count = source.count(old)
     if exact_count == 1:
@@ -713,12 +838,13 @@ def _replace_text(source: str, old: str, new: str, *, replace_all: bool) -> str:
 
 
 def _make_unified_diff(target: Path, before: str, after: str) -> str:
+    display = str(target)
     return "".join(
         unified_diff(
             before.splitlines(keepends=True),
             after.splitlines(keepends=True),
-            fromfile=str(target.resolve()),
-            tofile=str(target.resolve()),
+            fromfile=display,
+            tofile=display,
         )
     )
 
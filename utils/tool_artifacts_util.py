@@ -1,4 +1,5 @@
 from pathlib import Path
+import os
 import shutil
 
 
@@ -7,11 +8,13 @@ def clear_tool_artifacts() -> None:
     if not artifact_dir.exists() or not artifact_dir.is_dir():
         return
 
-    for item in artifact_dir.iterdir():
+    with os.scandir(artifact_dir) as scanner:
+        entries = list(scanner)
+    for entry in entries:
         try:
-            if item.is_file() or item.is_symlink():
-                item.unlink()
-            elif item.is_dir():
-                shutil.rmtree(item, ignore_errors=True)
+            if entry.is_symlink() or entry.is_file(follow_symlinks=False):
+                os.unlink(entry.path)
+            elif entry.is_dir(follow_symlinks=False):
+                shutil.rmtree(entry.path, ignore_errors=True)
         except FileNotFoundError:
             pass